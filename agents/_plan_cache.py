@@ -0,0 +1,59 @@
+# agents/_plan_cache.py
+"""
+Persistent cache of finished trip plans, stored in a local SQLite file.
+
+Plans are keyed on a hash of the request inputs, so a repeat request returns
+the stored plan without any LLM or Amadeus calls, across restarts too.
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+import time
+from contextlib import closing
+from typing import Optional
+
+PLAN_CACHE_PATH = os.getenv(
+    "TRIP_PLANNER_CACHE_DB",
+    os.path.join(os.path.expanduser("~"), ".cache", "trip_planner", "plans.db"),
+)
+
+# Prices move, so stored plans are only reused for an hour
+PLAN_CACHE_TTL_SECONDS = 3600
+
+
+def _connect() -> sqlite3.Connection:
+    os.makedirs(os.path.dirname(PLAN_CACHE_PATH), exist_ok=True)
+    conn = sqlite3.connect(PLAN_CACHE_PATH)
+    conn.execute(
+        "CREATE TABLE IF NOT EXISTS plans (key TEXT PRIMARY KEY, created REAL, plan TEXT)"
+    )
+    return conn
+
+
+def plan_key(**inputs) -> str:
+    """Return a stable SHA-256 key for the given request inputs."""
+    canonical = json.dumps(inputs, sort_keys=True, default=str)
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+def get_plan(key: str) -> Optional[str]:
+    """Return the stored plan for ``key`` if it is still fresh."""
+    with closing(_connect()) as conn:
+        row = conn.execute(
+            "SELECT plan FROM plans WHERE key = ? AND created > ?",
+            (key, time.time() - PLAN_CACHE_TTL_SECONDS),
+        ).fetchone()
+    return row[0] if row else None
+
+
+def put_plan(key: str, plan: str) -> None:
+    """Store ``plan`` under ``key`` and drop expired entries."""
+    now = time.time()
+    with closing(_connect()) as conn, conn:
+        conn.execute("DELETE FROM plans WHERE created <= ?", (now - PLAN_CACHE_TTL_SECONDS,))
+        conn.execute(
+            "INSERT OR REPLACE INTO plans (key, created, plan) VALUES (?, ?, ?)",
+            (key, now, plan),
+        )
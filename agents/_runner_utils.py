@@ -0,0 +1,44 @@
+# agents/_runner_utils.py
+"""
+Helpers for reading text out of ADK runner events.
+"""
+
+from typing import Iterable, List, Optional
+
+
+def event_texts(event) -> List[str]:
+    """Return the non-empty text parts of an event (empty list if it has none)."""
+    content = getattr(event, "content", None)
+    parts = getattr(content, "parts", None) or ()
+    return [part.text for part in parts if part.text]
+
+
+def tool_succeeded(response) -> bool:
+    """Return True if a function response carries real data.
+
+    Error markers such as {"error": "timeout"} and empty search results do not
+    count. ADK wraps non-dict return values as {"result": value}.
+    """
+    if not isinstance(response, dict) or "error" in response:
+        return False
+    result = response.get("result", response)
+    options = result.get("options") if isinstance(result, dict) else getattr(result, "options", None)
+    if options is not None:
+        return bool(options)
+    return bool(result)
+
+
+def extract_final_text(events: Iterable) -> Optional[str]:
+    """Return the last text part of a run's final response, if any.
+
+    The event stream is consumed only up to the event ADK marks as the final
+    response.
+    """
+    final_text = None
+    for event in events:
+        texts = event_texts(event)
+        if texts:
+            final_text = texts[-1]
+        if event.is_final_response():
+            break
+    return final_text
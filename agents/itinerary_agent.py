@@ -1,18 +1,15 @@
 # agents/itinerary_agent.py
 """
 Separate agent that uses Google Search to create detailed itineraries.
-This is needed because gemini-2.5-pro doesn't support google_search + function calling together.
+This is needed because gemini-2.5-pro doesn't support google_search + function calling together,
+so the trip planner calls it through an AgentTool.
 """
 
 from google.adk.agents import LlmAgent
 from google.adk.tools import google_search
 
-ITINERARY_SEARCH_AGENT = LlmAgent(
-    name="ItinerarySearchAgent",
-    model="gemini-2.5-pro",
-    description="Agent that searches for and structures travel itineraries using Google Search.",
-    
-    instruction="""# Itinerary Search Agent
+# Static, like the planner's instruction, so the prompt prefix stays cacheable
+ITINERARY_SEARCH_INSTRUCTION = """# Itinerary Search Agent
 
 You are a travel itinerary specialist. Your job is to use Google Search to find comprehensive itinerary information for a destination.
 
@@ -34,6 +31,13 @@ Structure your response as a clear day-by-day itinerary:
 ...
 
 Include specific attraction names, recommended times, and practical tips from your search results.
-""",
+"""
+
+ITINERARY_SEARCH_AGENT = LlmAgent(
+    name="ItinerarySearchAgent",
+    model="gemini-2.5-pro",
+    description="Agent that searches for and structures travel itineraries using Google Search.",
+    
+    instruction=ITINERARY_SEARCH_INSTRUCTION,
     tools=[google_search]
 )
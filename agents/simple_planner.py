@@ -3,12 +3,74 @@
 Simplified single-agent trip planner with direct function wrappers.
 """
 
+import asyncio
+import logging
+import os
+import threading
+import time
 from google.adk.agents import LlmAgent
-from google.adk.tools import google_search
-from tools.travel_tools import FLIGHT_TOOL, HOTEL_TOOL, ITINERARY_TOOL
+from google.adk.tools.agent_tool import AgentTool
+from tools.iata import to_iata
+from tools.travel_tools import FLIGHT_TOOL, HOTEL_TOOL, ensure_amadeus_token
+from .itinerary_agent import ITINERARY_SEARCH_AGENT
 
-# Create simple wrapper functions that LLM can call directly
-def flight_search(originLocationCode: str, destinationLocationCode: str, departureDate: str, adults: int):
+logger = logging.getLogger("trip_planner")
+
+# The planner only orchestrates tool calls and formats their results, which
+# the faster flash model handles well. Override with PLANNER_MODEL if needed.
+PLANNER_MODEL = os.getenv("PLANNER_MODEL", "gemini-2.5-flash")
+
+# Amadeus results for the same query are stable for a few minutes, so identical
+# searches are memoized. The time bucket in the cache key expires entries.
+SEARCH_CACHE_TTL_SECONDS = 300
+_SEARCH_CACHE = {}
+
+def _cache_bucket() -> int:
+    return int(time.monotonic() // SEARCH_CACHE_TTL_SECONDS)
+
+# A slow or failing Amadeus call must not hold up the whole plan. Past this
+# limit, or on any error, the tool returns an error marker and the planner
+# carries on with the other results.
+TOOL_TIMEOUT_SECONDS = 15.0
+
+async def _run_search(tool_name: str, search, *args):
+    """Run a cached, time-bounded Amadeus search."""
+    bucket = _cache_bucket()
+    key = (bucket, tool_name) + args
+    if key in _SEARCH_CACHE:
+        return _SEARCH_CACHE[key]
+    
+    try:
+        result = await asyncio.wait_for(search(*args), timeout=TOOL_TIMEOUT_SECONDS)
+    except asyncio.TimeoutError:
+        return {"error": "timeout", "tool": tool_name}
+    except Exception as e:
+        # Any other failure (e.g. Amadeus auth rejected) costs this tool only;
+        # the planner still gets the results of the others
+        logger.warning("⚠️ %s failed: %s", tool_name, e)
+        return {"error": "failed", "tool": tool_name}
+    
+    # The tools turn API errors into empty results; those are not cached, so a
+    # single failed call doesn't pin "nothing found" for the whole TTL
+    if not result.options:
+        return result
+    
+    # The search may have crossed into a new time bucket, so store under the
+    # current one. Drop entries from earlier buckets first; other Streamlit
+    # sessions may write concurrently, so iterate over a snapshot.
+    bucket = _cache_bucket()
+    key = (bucket, tool_name) + args
+    for old_key in list(_SEARCH_CACHE):
+        if old_key[0] != bucket:
+            _SEARCH_CACHE.pop(old_key, None)
+    _SEARCH_CACHE[key] = result
+    return result
+
+# Create simple wrapper functions that LLM can call directly.
+# Both are coroutines: ADK runs the function calls from one model turn
+# concurrently, and the Amadeus tools use async HTTP, so the searches overlap
+# instead of running back to back.
+async def flight_search(originLocationCode: str, destinationLocationCode: str, departureDate: str, adults: int):
     """Search for flight options using Amadeus API.
     
     Args:
@@ -17,9 +79,9 @@ def flight_search(originLocationCode: str, destinationLocationCode: str, departu
         departureDate: Date in YYYY-MM-DD format
         adults: Number of adult passengers
     """
-    return FLIGHT_TOOL.run(originLocationCode, destinationLocationCode, departureDate, adults)
+    return await _run_search("flight_search", FLIGHT_TOOL.arun, to_iata(originLocationCode), to_iata(destinationLocationCode), departureDate, adults)
 
-def hotel_search(cityCode: str, check_in: str, check_out: str, max_budget: float, adults: int = 2):
+async def hotel_search(cityCode: str, check_in: str, check_out: str, max_budget: float, adults: int = 2):
     """Search for hotel options using Amadeus API.
     
     Args:
@@ -29,52 +91,66 @@ def hotel_search(cityCode: str, check_in: str, check_out: str, max_budget: float
         max_budget: Maximum price per night in EUR
         adults: Number of adult guests (default: 2)
     """
-    return HOTEL_TOOL.run(cityCode, check_in, check_out, max_budget, adults)
+    return await _run_search("hotel_search", HOTEL_TOOL.arun, cityCode, check_in, check_out, max_budget, adults)
 
-def itinerary_generator(city: str, trip_length_days: int):
-    """Generate a structured itinerary for the trip.
-    
-    Args:
-        city: Destination city name
-        trip_length_days: Number of days for the trip
-    """
-    return ITINERARY_TOOL.run(city, trip_length_days)
-
-# Single agent with direct function tools
-SIMPLE_TRIP_PLANNER = LlmAgent(
-    name="SimpleTripPlanner",
-    model="gemini-2.5-pro",
-    description="Trip planner with flight, hotel, and itinerary tools.",
-    
-    instruction="""# Trip Planner Agent
+# The instruction is static and is always sent first, ahead of any
+# per-request content. Gemini 2.5's implicit context caching can then reuse
+# the already-processed prefix across requests. It must stay free of
+# {placeholders}, which ADK would fill from session state.
+SIMPLE_TRIP_PLANNER_INSTRUCTION = """# Trip Planner Agent
 
 You are a professional trip planning assistant with access to real-time flight and hotel search APIs.
 
 ## Your Task
-For every trip request, you MUST call these tools IN ORDER:
+For every trip request, you MUST call these three tools. They do not depend on
+each other, so request ALL THREE function calls together in your FIRST response;
+they run in parallel:
 
 1. **flight_search** - Get real flight options
-   - originLocationCode: 3-letter code (Chennai=MAA, Basel=BSL)
-   - destinationLocationCode: 3-letter code  
+   - originLocationCode: origin IATA code from the request
+   - destinationLocationCode: destination IATA code from the request
    - departureDate: YYYY-MM-DD
    - adults: number
 
 2. **hotel_search** - Get real hotel options
-   - cityCode: 3-letter code
+   - cityCode: destination IATA code from the request
    - check_in: YYYY-MM-DD (use underscore!)
    - check_out: YYYY-MM-DD (use underscore!)
-   - max_budget: 300.0
+   - max_budget: hotel budget per night from the request
    - adults: number of adult guests (e.g., 2)
 
-3. **itinerary_generator** - Signal for itinerary creation
-   - city: destination name
-   - trip_length_days: number of days
+3. **ItinerarySearchAgent** - Research a day-by-day itinerary with Google Search
+   - request: "Find a comprehensive <N>-day itinerary for <destination city>"
 
 ## Rules
-- Call ALL three tools for EVERY trip request
+- Call ALL three tools for EVERY trip request, in a single response
+- Do not wait for one tool's result before calling the next
+- Once all results are back, write the final answer in one response
 - Use EXACT parameter names
 - Never skip tools or make up data
+- If a tool result has "error": "timeout", say that search timed out; if it has "error": "failed", say that search is unavailable right now. Either way, continue with the other results
 - Present the flight and hotel results clearly
-""",
-    tools=[flight_search, hotel_search, itinerary_generator]
+- End with a "Detailed Itinerary" section built from the ItinerarySearchAgent result
+"""
+
+# Single agent with direct function tools
+SIMPLE_TRIP_PLANNER = LlmAgent(
+    name="SimpleTripPlanner",
+    model=PLANNER_MODEL,
+    description="Trip planner with flight, hotel, and itinerary tools.",
+    
+    instruction=SIMPLE_TRIP_PLANNER_INSTRUCTION,
+    # google_search can't share an agent with function tools, so the search
+    # agent is attached as a tool and runs alongside the Amadeus calls.
+    tools=[flight_search, hotel_search, AgentTool(agent=ITINERARY_SEARCH_AGENT)]
 )
+
+# Every tool the planner must call for a complete plan
+PLAN_TOOL_NAMES = frozenset({"flight_search", "hotel_search", ITINERARY_SEARCH_AGENT.name})
+
+def _warm_up() -> None:
+    """Prime the Amadeus token (and its pooled connection) before the first user request."""
+    ensure_amadeus_token()
+
+# Warm up in the background so importing this module never blocks on the network
+threading.Thread(target=_warm_up, daemon=True).start()
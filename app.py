@@ -4,11 +4,16 @@ Simple and attractive UI for the Trip Planner using Streamlit.
 Run with: streamlit run app.py
 """
 
+import asyncio
+import logging
+import sqlite3
 import streamlit as st
 from datetime import date, timedelta
 import os
+import uuid
 from dotenv import load_dotenv
 from google.adk import Runner
+from google.adk.agents.run_config import RunConfig, StreamingMode
 from google.adk.sessions import InMemorySessionService
 from google.genai import types
 
@@ -17,7 +22,11 @@ load_dotenv()
 
 # Import agents
 from agents.root_agent import ROOT_AGENT
-from agents.itinerary_agent import ITINERARY_SEARCH_AGENT
+from agents._plan_cache import get_plan, plan_key, put_plan
+from agents._runner_utils import event_texts, tool_succeeded
+from agents.simple_planner import PLAN_TOOL_NAMES, PLANNER_MODEL
+
+logger = logging.getLogger("trip_planner")
 
 # Page configuration
 st.set_page_config(
@@ -26,38 +35,132 @@ st.set_page_config(
     layout="centered"
 )
 
-# Custom CSS for better styling
-st.markdown("""
-    <style>
-    .main {
-        padding: 2rem;
-    }
-    .stButton>button {
-        width: 100%;
-        background-color: #FF4B4B;
-        color: white;
-        font-size: 18px;
-        font-weight: bold;
-        padding: 0.75rem;
-        border-radius: 10px;
-        border: none;
-        margin-top: 1rem;
-    }
-    .stButton>button:hover {
-        background-color: #FF3333;
-    }
-    h1 {
-        color: #FF4B4B;
-        text-align: center;
-    }
-    .result-box {
-        background-color: #f0f2f6;
-        padding: 1.5rem;
-        border-radius: 10px;
-        margin-top: 1rem;
-    }
-    </style>
-""", unsafe_allow_html=True)
+# Custom CSS for better styling. The file is read once per server process;
+# the <style> tag still has to be emitted on every rerun to stay on the page.
+@st.cache_data
+def load_css() -> str:
+    with open(os.path.join(os.path.dirname(__file__), "static", "style.css")) as css_file:
+        return css_file.read()
+
+st.markdown(f"<style>{load_css()}</style>", unsafe_allow_html=True)
+
+# The runner is expensive to build, so create it once per server process
+@st.cache_resource
+def get_runner():
+    """Create the shared session service and the trip planner runner."""
+    session_service = InMemorySessionService()
+    
+    runner = Runner(
+        app_name="TripPlanner",
+        agent=ROOT_AGENT,
+        session_service=session_service
+    )
+    
+    return session_service, runner
+
+# Upper bound on a single planner run, tool calls and itinerary search included
+PLAN_TIMEOUT_SECONDS = 120
+
+async def stream_plan(user_prompt: str, placeholder):
+    """Run the trip planner, streaming its answer into ``placeholder``.
+    
+    Returns ``(final_text, complete)``; ``complete`` is True only when every
+    planner tool returned real data (no timeouts, errors or empty results).
+    """
+    session_service, runner = get_runner()
+    
+    # Fresh session ID per run so runs never collide in the shared service
+    user_id = "streamlit_user"
+    session_id = f"trip_{uuid.uuid4().hex}"
+    
+    await session_service.create_session(
+        app_name="TripPlanner",
+        user_id=user_id,
+        session_id=session_id
+    )
+    
+    # Create message
+    message = types.Content(
+        role="user",
+        parts=[types.Part(text=user_prompt)]
+    )
+    
+    # SSE streaming yields partial events as the model generates tokens
+    run_config = RunConfig(streaming_mode=StreamingMode.SSE)
+    
+    # Flights, hotels and the itinerary search all come back from this one
+    # run: the planner calls the itinerary agent as a tool in the same turn.
+    final_text = None
+    streamed_text = ""
+    tool_ok = {}
+    try:
+        async for event in runner.run_async(
+            user_id=user_id,
+            session_id=session_id,
+            new_message=message,
+            run_config=run_config
+        ):
+            texts = event_texts(event)
+            if event.partial:
+                for text in texts:
+                    streamed_text += text
+                    placeholder.markdown(streamed_text)
+            elif texts:
+                # The aggregated, non-partial event closes the turn; keep every
+                # text part of it, not just the last one
+                final_text = "".join(texts)
+                streamed_text = ""
+            
+            # Record whether each tool call came back with usable data
+            content = getattr(event, "content", None)
+            for part in getattr(content, "parts", None) or ():
+                func_resp = part.function_response
+                if func_resp:
+                    tool_ok[func_resp.name] = tool_ok.get(func_resp.name, True) and tool_succeeded(func_resp.response)
+        
+        complete = PLAN_TOOL_NAMES <= tool_ok.keys() and all(tool_ok.values())
+        return final_text, complete
+    finally:
+        # Only the final text is kept, so drop the per-run session
+        await session_service.delete_session(
+            app_name="TripPlanner", user_id=user_id, session_id=session_id
+        )
+
+def run_plan(user_prompt: str, placeholder):
+    """Synchronous entry point for the Streamlit script."""
+    # Bound the whole run so a hung upstream call can't stall the page
+    return asyncio.run(asyncio.wait_for(stream_plan(user_prompt, placeholder), timeout=PLAN_TIMEOUT_SECONDS))
+
+def cached_plan(user_prompt: str, placeholder):
+    """Return a stored plan for ``user_prompt`` or run the planner.
+    
+    The prompt embeds every form input (destination, codes, dates, travelers,
+    budget), so together with the model name it is a complete cache key:
+    re-running an unchanged query skips ROOT_AGENT and the Amadeus calls.
+    """
+    key = plan_key(prompt=user_prompt, model=PLANNER_MODEL)
+    
+    # The cache is an optimization only: if SQLite fails (read-only home dir,
+    # "database is locked", ...) the request still runs and the plan is shown
+    try:
+        final_text = get_plan(key)
+    except (sqlite3.Error, OSError) as e:
+        logger.warning("⚠️ Plan cache read failed, running the planner: %s", e)
+        final_text = None
+    if final_text:
+        return final_text
+    
+    final_text, complete = run_plan(user_prompt, placeholder)
+    # A plan built on a timed-out or empty search is shown but not stored,
+    # so the next identical request tries the searches again
+    if final_text and complete:
+        try:
+            put_plan(key, final_text)
+        except (sqlite3.Error, OSError) as e:
+            logger.warning("⚠️ Plan cache write failed, plan not stored: %s", e)
+    
+    return final_text
+
 
 # Title
 st.title("✈️ AI Trip Planner")
@@ -96,13 +199,21 @@ with col4:
 
 st.markdown("---")
 
+def is_iata_code(code: str) -> bool:
+    """Return True for a well-formed 3-letter IATA code such as 'MAA'."""
+    return len(code) == 3 and code.isalpha()
+
 # Plan Trip Button
 if st.button("🚀 Plan My Trip!"):
-    # Validation
+    # Validation: everything is checked before any agent work starts
     if not destination or not origin or not destination_code or not origin_code:
         st.error("⚠️ Please fill in all required fields!")
+    elif not is_iata_code(origin_code.strip()) or not is_iata_code(destination_code.strip()):
+        st.error("⚠️ IATA codes must be exactly 3 letters (e.g., MAA, BSL)!")
     elif arrival_date >= departure_date:
         st.error("⚠️ Departure date must be after arrival date!")
+    elif not os.getenv("GOOGLE_API_KEY"):
+        st.error("⚠️ GOOGLE_API_KEY not set! Please configure your API keys.")
     else:
         # Create the prompt
         travelers_text = f"{adults} adult{'s' if adults > 1 else ''}"
@@ -112,108 +223,28 @@ if st.button("🚀 Plan My Trip!"):
         user_prompt = (
             f"Plan a {trip_days}-day trip to {destination}, arriving on {arrival_date} and departing {departure_date}. "
             f"I will be traveling with {travelers_text}. My origin airport is {origin}. "
+            f"Use originLocationCode={origin_code.strip().upper()} and destinationLocationCode={destination_code.strip().upper()}, "
+            f"and cityCode={destination_code.strip().upper()} for hotels. "
             f"The maximum I want to spend on a hotel is {hotel_budget} Euros per night."
         )
         
-        # Setup environment
-        if not os.getenv("GOOGLE_API_KEY"):
-            st.error("⚠️ GOOGLE_API_KEY not set! Please configure your API keys.")
-            st.stop()
-        
         # Show loading spinner
         with st.spinner("🔍 Searching for flights and hotels... This may take a minute."):
             try:
-                # Initialize session service
-                session_service = InMemorySessionService()
-                
-                # Create session
-                app_name = "TripPlanner"
-                user_id = "streamlit_user"
-                session_id = f"session_{arrival_date}_{departure_date}"
+                # Show trip summary, streaming it in as the planner writes
+                st.markdown("## 🏆 Your Trip Plan")
+                plan_placeholder = st.empty()
                 
-                session = session_service.create_session_sync(
-                    app_name=app_name,
-                    user_id=user_id,
-                    session_id=session_id
-                )
-                
-                # Create runner
-                runner = Runner(
-                    app_name=app_name,
-                    agent=ROOT_AGENT,
-                    session_service=session_service
-                )
-                
-                # Create message
-                message = types.Content(
-                    role="user",
-                    parts=[types.Part(text=user_prompt)]
-                )
-                
-                # Run agent
-                events = runner.run(
-                    user_id=user_id,
-                    session_id=session_id,
-                    new_message=message
-                )
-                
-                # Process results
-                final_text = None
-                for event in events:
-                    if hasattr(event, 'content') and event.content:
-                        if hasattr(event.content, 'parts'):
-                            for part in event.content.parts:
-                                if hasattr(part, 'text') and part.text:
-                                    final_text = part.text
-                
-                # Get itinerary
-                itinerary_runner = Runner(
-                    app_name="ItineraryPlanner",
-                    agent=ITINERARY_SEARCH_AGENT,
-                    session_service=session_service
-                )
-                
-                itinerary_session = session_service.create_session_sync(
-                    app_name="ItineraryPlanner",
-                    user_id=user_id,
-                    session_id="itinerary_session"
-                )
-                
-                itinerary_prompt = f"Find a comprehensive {trip_days}-day itinerary for {destination}"
-                
-                itinerary_message = types.Content(
-                    role="user",
-                    parts=[types.Part(text=itinerary_prompt)]
-                )
-                
-                itinerary_events = itinerary_runner.run(
-                    user_id=user_id,
-                    session_id="itinerary_session",
-                    new_message=itinerary_message
-                )
-                
-                itinerary_text = None
-                for event in itinerary_events:
-                    if hasattr(event, 'content') and event.content:
-                        if hasattr(event.content, 'parts'):
-                            for part in event.content.parts:
-                                if hasattr(part, 'text') and part.text:
-                                    itinerary_text = part.text
+                # Repeat clicks with identical inputs are served from the cache
+                final_text = cached_plan(user_prompt, plan_placeholder)
                 
                 # Display results
-                st.success("✅ Trip plan generated successfully!")
-                
-                # Show trip summary
                 if final_text:
-                    st.markdown("## 🏆 Your Trip Plan")
-                    st.markdown(final_text)
-                
-                # Show itinerary
-                if itinerary_text:
-                    st.markdown("---")
-                    st.markdown("## 🗺️ Detailed Itinerary")
-                    st.markdown(itinerary_text)
+                    plan_placeholder.markdown(final_text)
+                st.success("✅ Trip plan generated successfully!")
                 
+            except asyncio.TimeoutError:
+                st.error(f"⏱️ Planning took longer than {PLAN_TIMEOUT_SECONDS} seconds. Please try again.")
             except Exception as e:
                 st.error(f"❌ An error occurred: {str(e)}")
                 st.info("💡 Tip: Make sure your API keys are configured correctly in the .env file")
@@ -6,84 +6,93 @@ from dotenv import load_dotenv
 from google.adk import Runner
 from google.adk.agents import LlmAgent
 from google.adk.sessions import InMemorySessionService
-from google.genai import types
+from google.genai.types import Content, Part
+from agents._runner_utils import extract_final_text
 
 # Load .env file
 load_dotenv()
 
-print("="*70)
-print("🧪 QUICK INTEGRATION TEST")
-print("="*70)
+_BAR = "=" * 70
 
-# Check API key
-api_key = os.getenv("GOOGLE_API_KEY")
-if not api_key or api_key.startswith("MOCK"):
-    print("\n❌ No valid GOOGLE_API_KEY found in .env")
-    exit(1)
-else:
-    print(f"\n✅ GOOGLE_API_KEY loaded: {api_key[:20]}...")
+def _fail(message):
+    """Report a failed check and stop with a non-zero exit status."""
+    print(f"\n❌ {message}")
+    raise SystemExit(1)
 
-# Create simple agent
-agent = LlmAgent(
-    name="TestAgent",
-    model="gemini-2.0-flash-exp",
-    description="A test agent",
-    instruction="You are a helpful assistant. Answer briefly."
-)
+def main():
+    """Send one prompt through a minimal agent and report whether Gemini answered."""
+    print(_BAR)
+    print("🧪 QUICK INTEGRATION TEST")
+    print(_BAR)
 
-# Setup runner
-session_service = InMemorySessionService()
-session = session_service.create_session_sync(
-    app_name="QuickTest",
-    user_id="test_user",
-    session_id="test_session_123"
-)
+    # Check API key
+    api_key = os.getenv("GOOGLE_API_KEY")
+    if not api_key or api_key.startswith("MOCK"):
+        _fail("No valid GOOGLE_API_KEY found in .env")
+    else:
+        print(f"\n✅ GOOGLE_API_KEY loaded: {api_key[:20]}...")
 
-runner = Runner(
-    app_name="QuickTest",
-    agent=agent,
-    session_service=session_service
-)
+    # Create simple agent
+    agent = LlmAgent(
+        name="TestAgent",
+        model="gemini-2.0-flash-exp",
+        description="A test agent",
+        instruction="You are a helpful assistant. Answer briefly."
+    )
 
-# Create message
-message = types.Content(
-    role="user",
-    parts=[types.Part(text="What is 2+2? Answer in one sentence.")]
-)
+    # Setup runner
+    session_service = InMemorySessionService()
+    session = session_service.create_session_sync(
+        app_name="QuickTest",
+        user_id="test_user",
+        session_id="test_session_123"
+    )
 
-print("\n🚀 Sending request to Gemini...")
+    runner = Runner(
+        app_name="QuickTest",
+        agent=agent,
+        session_service=session_service
+    )
 
-try:
-    events = runner.run(
-        user_id="test_user",
-        session_id="test_session_123",
-        new_message=message
+    # Create message
+    message = Content(
+        role="user",
+        parts=[Part(text="What is 2+2? Answer in one sentence.")]
     )
+
+    print("\n🚀 Sending request to Gemini...")
+
+    try:
+        events = runner.run(
+            user_id="test_user",
+            session_id="test_session_123",
+            new_message=message
+        )
     
-    print("\n📨 Received events:")
-    response_text = None
-    for event in events:
-        if hasattr(event, 'content') and event.content:
-            if hasattr(event.content, 'parts'):
-                for part in event.content.parts:
-                    if hasattr(part, 'text') and part.text:
-                        response_text = part.text
+        print("\n📨 Received events:")
+        response_text = extract_final_text(events)
     
-    if response_text:
-        print(f"\n✅ SUCCESS! Gemini responded:")
-        print(f"   '{response_text}'")
-        print("\n" + "="*70)
-        print("🎉 ALL SYSTEMS WORKING!")
-        print("="*70)
-        print("\n✅ Compatibility issue SOLVED")
-        print("✅ API key working")
-        print("✅ google.genai.types integration successful")
-        print("\n👉 You can now run: python runner.py")
-        print("="*70)
-    else:
-        print("\n⚠️  No response text found")
+        if response_text:
+            # The summary is written in one go rather than line by line
+            print("\n".join([
+                "\n✅ SUCCESS! Gemini responded:",
+                f"   '{response_text}'",
+                "\n" + _BAR,
+                "🎉 ALL SYSTEMS WORKING!",
+                _BAR,
+                "\n✅ Compatibility issue SOLVED",
+                "✅ API key working",
+                "✅ google.genai.types integration successful",
+                "\n👉 You can now run: python runner.py",
+                _BAR,
+            ]))
+        else:
+            print("\n⚠️  No response text found")
         
-except Exception as e:
-    print(f"\n❌ Error: {e}")
-    import traceback
-    traceback.print_exc()
+    except Exception as e:
+        import traceback
+        traceback.print_exc()
+        _fail(f"Error: {e}")
+
+if __name__ == "__main__":
+    main()
@@ -1,31 +1,49 @@
 # runner.py
 
+import asyncio
+import logging
 import os
+import sys
 from dotenv import load_dotenv
 from google.adk import Runner
+from google.adk.agents.run_config import RunConfig, StreamingMode
 from google.adk.sessions import Session, InMemorySessionService
 from google.genai import types  # Use google.genai.types, not google.generativeai.protos
 
+# uvloop is a faster drop-in event loop; it is optional and not available on Windows
+try:
+    import uvloop
+except ImportError:
+    uvloop = None
+
 # Load environment variables from .env file
 load_dotenv()
 
+# Set TRIP_PLANNER_DEBUG=1 to log per-event details, tool validation and session state.
+# Otherwise only warnings and errors are logged, and the log calls below that
+# level return before formatting anything.
+DEBUG = bool(os.getenv("TRIP_PLANNER_DEBUG"))
+logging.basicConfig(format="%(message)s")
+logger = logging.getLogger("trip_planner")
+logger.setLevel(logging.DEBUG if DEBUG else logging.WARNING)
+
 # 1. Import the main agents
 from agents.root_agent import ROOT_AGENT
-from agents.itinerary_agent import ITINERARY_SEARCH_AGENT 
+from agents._runner_utils import event_texts
 
 # 2. Setup API Keys and Environment
 def setup_environment():
     """Sets placeholder API keys if they are not already set."""
-    print("--- Environment Setup ---")
+    logger.info("--- Environment Setup ---")
     
     # Google AI API Key (required for Gemini models)
     if not os.getenv("GOOGLE_API_KEY"):
-        print("⚠️  WARNING: GOOGLE_API_KEY not set!")
-        print("   Get your API key from: https://aistudio.google.com/app/apikey")
-        print("   Set it with: export GOOGLE_API_KEY='your-key-here'")
+        logger.warning("⚠️  WARNING: GOOGLE_API_KEY not set!")
+        logger.warning("   Get your API key from: https://aistudio.google.com/app/apikey")
+        logger.warning("   Set it with: export GOOGLE_API_KEY='your-key-here'")
         os.environ["GOOGLE_API_KEY"] = "MOCK_GOOGLE_KEY_FOR_TESTING"
     else:
-        print("✓ GOOGLE_API_KEY is set")
+        logger.info("✓ GOOGLE_API_KEY is set")
     
     # Amadeus API credentials (for travel tools)
     # WARNING: Replace these placeholders with your actual Amadeus keys 
@@ -34,11 +52,78 @@ def setup_environment():
         os.environ["AMADEUS_API_KEY"] = "MOCK_AMADEUS_KEY_FOR_TESTING"
     if not os.getenv("AMADEUS_API_SECRET"):
         os.environ["AMADEUS_API_SECRET"] = "MOCK_AMADEUS_SECRET_FOR_TESTING"
-    print("✓ Amadeus environment variables set (using mock/test values).")
-    print("-------------------------")
+    logger.info("✓ Amadeus environment variables set (using mock/test values).")
+    logger.info("-------------------------")
+
+# 3. Debug reports, logged only when TRIP_PLANNER_DEBUG is set
+def _log_tool_validation(tool_calls_detected):
+    """Reports which specialized tools the planner actually called."""
+    # 🔍 VALIDATION: Check if specialized tools were called
+    logger.debug("=" * 80)
+    logger.debug("🔍 TOOL EXECUTION VALIDATION")
+    logger.debug("=" * 80)
+    logger.debug("Tool calls detected: %s", tool_calls_detected)
+
+    flight_tool_used = any('flight' in name.lower() for name in tool_calls_detected)
+    hotel_tool_used = any('hotel' in name.lower() for name in tool_calls_detected)
+    itinerary_tool_used = any('itinerary' in name.lower() for name in tool_calls_detected)
+
+    logger.debug("✈️  Flight Search Tool: %s", '✅ CALLED' if flight_tool_used else '❌ NOT CALLED')
+    logger.debug("🏨 Hotel Search Tool: %s", '✅ CALLED' if hotel_tool_used else '❌ NOT CALLED')
+    logger.debug("🗺️ Itinerary Search Agent: %s", '✅ CALLED' if itinerary_tool_used else '❌ NOT CALLED')
+
+    if not flight_tool_used or not hotel_tool_used or not itinerary_tool_used:
+        logger.warning("⚠️  WARNING: Some specialized tools were not invoked!")
+        logger.warning("   This means the LLM generated estimates instead of using real API data.")
+        logger.warning("   The response may contain fabricated information.")
+    logger.debug("=" * 80)
+
+async def _log_session_state(session_service, app_name, user_id, session_id):
+    """Logs what the agents stored in the session state."""
+    # 🧠 DEBUG: Log session state to see what data was stored
+    logger.debug("=" * 80)
+    logger.debug("🧠 SESSION STATE DEBUG")
+    logger.debug("=" * 80)
+
+    # Get the session to inspect state
+    current_session = await session_service.get_session(
+        app_name=app_name,
+        user_id=user_id,
+        session_id=session_id
+    )
+
+    if current_session and hasattr(current_session, 'state'):
+        # Session state is a dict, so we can access it directly
+        logger.debug("Session state type: %s", type(current_session.state))
+        logger.debug("Session state keys: %s", list(current_session.state.keys()))
 
-# 3. Define the main execution function
-def run_trip_planner():
+        # Access stored values using dict methods
+        flight_data = current_session.state.get("flight_options")
+        hotel_data = current_session.state.get("hotel_options")
+        itinerary_data = current_session.state.get("itinerary_plan")
+
+        # Display results
+        if flight_data:
+            logger.debug("✈️  flight_options: %s", flight_data)
+        else:
+            logger.debug("✈️  flight_options: NOT SET (agents didn't store data)")
+
+        if hotel_data:
+            logger.debug("🏨 hotel_options: %s", hotel_data)
+        else:
+            logger.debug("🏨 hotel_options: NOT SET (agents didn't store data)")
+
+        if itinerary_data:
+            logger.debug("📋 itinerary_plan: %s", itinerary_data)
+        else:
+            logger.debug("📋 itinerary_plan: NOT SET (agents didn't store data)")
+    else:
+        logger.warning("⚠️  Cannot access session state")
+
+    logger.debug("=" * 80)
+
+# 4. Define the main execution function
+async def run_trip_planner():
     """Initializes the runner and executes the trip planner agent."""
     
     # Ensure environment variables are set before tools are initialized
@@ -49,10 +134,11 @@ def run_trip_planner():
     user_prompt = (
         "Plan a 4-day trip to Basel, Switzerland, arriving on 2026-06-10 and departing 2026-06-14. "
         "I will be traveling with husband and my kid who is 5 years old  (2 adults and 1 kid). My origin airport is Chennai. "
+        "Use originLocationCode=MAA and destinationLocationCode=BSL, and cityCode=BSL for hotels. "
         "The maximum I want to spend on a hotel is 300 Euros per night."
     )
 
-    print(f"\n✅ Starting Trip Planner for request:\n> {user_prompt}\n")
+    logger.info("✅ Starting Trip Planner for request:\n> %s", user_prompt)
     
     # Initialize the ADK Runner with an in-memory session service
     session_service = InMemorySessionService()
@@ -62,7 +148,7 @@ def run_trip_planner():
     user_id = "user123"
     session_id = "session123"
     
-    session = session_service.create_session_sync(
+    session = await session_service.create_session(
         app_name=app_name,
         user_id=user_id,
         session_id=session_id
@@ -75,11 +161,11 @@ def run_trip_planner():
     )
     
     # Run the session with the user's prompt
-    print("🚀 Executing Multi-Agent Pipeline...")
+    logger.info("🚀 Executing Multi-Agent Pipeline...")
     
     # The Runner manages the entire workflow: 
-    # ROOT_AGENT calls TRIP_PLANNER_TOOL 
-    # which executes PARALLEL_PLANNER and then ITINERARY_AGENT.
+    # ROOT_AGENT calls flight_search, hotel_search and the ItinerarySearchAgent
+    # tool in a single turn, so one run produces the whole plan.
     try:
         # Create a proper Content message using google.genai.types
         message = types.Content(
@@ -88,148 +174,66 @@ def run_trip_planner():
         )
         
         # Run the agent with user_id and session_id
-        events = runner.run(
+        events = runner.run_async(
             user_id=user_id,
             session_id=session_id,
-            new_message=message
+            new_message=message,
+            # SSE streaming yields partial text events while the answer is generated
+            run_config=RunConfig(streaming_mode=StreamingMode.SSE)
         )
         
         # Process events and collect the final response
         final_text = None
-        tool_calls_detected = []
+        tool_calls_detected = [] if DEBUG else None
         
-        for event in events:
-            event_type = type(event).__name__
-            print(f"📨 Event: {event_type}")
+        async for event in events:
+            # Streamed chunks go straight to the terminal as they arrive. The
+            # complete text follows in a non-partial event, handled below.
+            if event.partial:
+                for text in event_texts(event):
+                    sys.stdout.write(text)
+                    sys.stdout.flush()
+                continue
             
-            # Print event details for debugging
-            if hasattr(event, 'content') and event.content:
-                print(f"   Content received: {event.content}")
-                
-                if hasattr(event.content, 'parts'):
-                    for part in event.content.parts:
-                        # Check for text
-                        if hasattr(part, 'text') and part.text:
-                            final_text = part.text
-                            print(f"   ✓ Text part found")
-                        
-                        # Check for function calls
-                        if hasattr(part, 'function_call') and part.function_call:
-                            func_call = part.function_call
-                            tool_calls_detected.append(func_call.name)
-                            print(f"   🔧 Function call: {func_call.name}")
-                            print(f"      Args: {func_call.args}")
-                        
-                        # Check for function responses
-                        if hasattr(part, 'function_response') and part.function_response:
-                            func_resp = part.function_response
-                            print(f"   ✅ Function response from: {func_resp.name}")
-                            print(f"      Result: {func_resp.response}")
-        
-        # 🔍 VALIDATION: Check if specialized tools were called
-        print("\n" + "=" * 80)
-        print("🔍 TOOL EXECUTION VALIDATION")
-        print("=" * 80)
-        print(f"Tool calls detected: {tool_calls_detected}")
-        
-        flight_tool_used = any('flight' in name.lower() for name in tool_calls_detected)
-        hotel_tool_used = any('hotel' in name.lower() for name in tool_calls_detected)
-        
-        print(f"✈️  Flight Search Tool: {'✅ CALLED' if flight_tool_used else '❌ NOT CALLED'}")
-        print(f"🏨 Hotel Search Tool: {'✅ CALLED' if hotel_tool_used else '❌ NOT CALLED'}")
-        
-        if not flight_tool_used or not hotel_tool_used:
-            print("\n⚠️  WARNING: Some specialized tools were not invoked!")
-            print("   This means the LLM generated estimates instead of using real API data.")
-            print("   The response may contain fabricated information.")
-        print("=" * 80 + "\n")
-        
-        # 🧠 DEBUG: Print session state to see what data was stored
-        print("\n" + "=" * 80)
-        print("🧠 SESSION STATE DEBUG")
-        print("=" * 80)
-        
-        # Get the session to inspect state
-        current_session = session_service.get_session_sync(
-            app_name=app_name,
-            user_id=user_id,
-            session_id=session_id
-        )
-        
-        if current_session and hasattr(current_session, 'state'):
-            # Session state is a dict, so we can access it directly
-            print(f"Session state type: {type(current_session.state)}")
-            print(f"Session state keys: {list(current_session.state.keys())}")
-            print()
+            content = getattr(event, "content", None)
+            if not content:
+                continue
             
-            # Access stored values using dict methods
-            flight_data = current_session.state.get("flight_options")
-            hotel_data = current_session.state.get("hotel_options")
-            itinerary_data = current_session.state.get("itinerary_plan")
+            # Keep every text part of the response, not just the last one
+            texts = event_texts(event)
+            if texts:
+                final_text = "".join(texts)
             
-            # Display results
-            if flight_data:
-                print(f"✈️  flight_options: {flight_data}")
-            else:
-                print(f"✈️  flight_options: NOT SET (agents didn't store data)")
+            if not DEBUG:
+                continue
             
-            if hotel_data:
-                print(f"🏨 hotel_options: {hotel_data}")
-            else:
-                print(f"🏨 hotel_options: NOT SET (agents didn't store data)")
+            # Log event details for debugging
+            logger.debug("📨 Event: %s", type(event).__name__)
+            logger.debug("   Content received: %s", content)
             
-            if itinerary_data:
-                print(f"📋 itinerary_plan: {itinerary_data}")
-            else:
-                print(f"📋 itinerary_plan: NOT SET (agents didn't store data)")
-        else:
-            print("⚠️  Cannot access session state")
-        
-        print("=" * 80 + "\n")
-        
-        # 🗺️ Now get the itinerary using the separate itinerary agent
-        print("\n" + "=" * 80)
-        print("🗺️ FETCHING ITINERARY WITH GOOGLE SEARCH")
-        print("=" * 80)
-        
-        # Create a runner for the itinerary agent
-        itinerary_runner = Runner(
-            app_name="ItineraryPlanner",
-            agent=ITINERARY_SEARCH_AGENT,
-            session_service=session_service
-        )
-        
-        # Create a new session for the itinerary agent
-        itinerary_session = session_service.create_session_sync(
-            app_name="ItineraryPlanner",
-            user_id=user_id,
-            session_id="itinerary_session"
-        )
-        
-        # Extract city and duration from the user prompt
-        itinerary_prompt = "Find a comprehensive 4-day itinerary for Basel, Switzerland"
-        
-        itinerary_message = types.Content(
-            role="user",
-            parts=[types.Part(text=itinerary_prompt)]
-        )
-        
-        itinerary_events = itinerary_runner.run(
-            user_id=user_id,
-            session_id="itinerary_session",
-            new_message=itinerary_message
-        )
+            for part in getattr(content, "parts", None) or ():
+                # Check for text
+                if part.text:
+                    logger.debug("   ✓ Text part found")
+                
+                # Check for function calls
+                func_call = part.function_call
+                if func_call:
+                    tool_calls_detected.append(func_call.name)
+                    logger.debug("   🔧 Function call: %s", func_call.name)
+                    logger.debug("      Args: %s", func_call.args)
+                
+                # Check for function responses
+                func_resp = part.function_response
+                if func_resp:
+                    logger.debug("   ✅ Function response from: %s", func_resp.name)
+                    logger.debug("      Result: %s", func_resp.response)
         
-        itinerary_text = None
-        for event in itinerary_events:
-            if hasattr(event, 'content') and event.content:
-                if hasattr(event.content, 'parts'):
-                    for part in event.content.parts:
-                        if hasattr(part, 'text') and part.text:
-                            itinerary_text = part.text
+        # The validation and session state reports are for development only
+        if DEBUG:
+            _log_tool_validation(tool_calls_detected)
+            await _log_session_state(session_service, app_name, user_id, session_id)
         
-        print("=" * 80 + "\n")
-                            
         # Display the final synthesis from the ROOT_AGENT
         print("\n--- 🏆 Final Trip Plan Summary ---")
         if final_text:
@@ -237,12 +241,6 @@ def run_trip_planner():
         else:
             print("No response generated")
         
-        # Add itinerary if we got it
-        if itinerary_text:
-            print("\n--- 🗺️ Detailed Itinerary ---")
-            print(itinerary_text)
-            print("-----------------------------")
-        
         print("---------------------------------")
         
         # Optional: Print the final state to see all collected data
@@ -253,9 +251,12 @@ def run_trip_planner():
         # print("----------------------------------------------")
         
     except Exception as e:
-        print(f"\n❌ An error occurred during the execution: {e}")
+        logger.error("❌ An error occurred during the execution: %s", e)
         # This often happens if the API keys are invalid or the model 
         # cannot correctly extract parameters for the tool call.
 
 if __name__ == "__main__":
-    run_trip_planner()
\ No newline at end of file
+    if uvloop is not None:
+        uvloop.run(run_trip_planner())
+    else:
+        asyncio.run(run_trip_planner())
\ No newline at end of file
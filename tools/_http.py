@@ -0,0 +1,93 @@
+# tools/_http.py
+"""
+Shared HTTP client for outbound API calls.
+
+One pooled, keep-alive HTTP/2 client means repeated calls to the same host
+reuse an open connection instead of paying a TCP+TLS handshake each time.
+"""
+
+import asyncio
+import threading
+
+import httpx
+from tenacity import retry, retry_if_exception, stop_after_attempt, wait_exponential
+
+# All traffic goes to a single Amadeus host, so a small pool is plenty: with
+# HTTP/2 the concurrent searches are multiplexed over one connection anyway.
+HTTP_LIMITS = httpx.Limits(max_connections=8, max_keepalive_connections=4)
+# A stalled connect should fail fast; reads get longer since searches are slow
+HTTP_TIMEOUT = httpx.Timeout(10.0, connect=3.0)
+
+# Every Amadeus endpoint lives on this host, so callers pass relative paths and
+# all of their requests share (and multiplex over) the same HTTP/2 connection.
+AMADEUS_BASE_URL = "https://test.api.amadeus.com"
+
+# An AsyncClient's connections belong to the event loop that opened them, but
+# callers come from many short-lived loops (each Streamlit click, each sync
+# run() and the warm-up thread). All Amadeus I/O therefore runs on one
+# long-lived loop in a daemon thread, so the single client below, and its open
+# connection, lasts for the whole process instead of one loop.
+# uvloop, when installed, is a faster drop-in loop for this socket-heavy work.
+try:
+    import uvloop
+    _IO_LOOP = uvloop.new_event_loop()
+except ImportError:
+    _IO_LOOP = asyncio.new_event_loop()
+threading.Thread(target=_IO_LOOP.run_forever, name="amadeus-io", daemon=True).start()
+
+CLIENT = httpx.AsyncClient(http2=True, base_url=AMADEUS_BASE_URL, limits=HTTP_LIMITS, timeout=HTTP_TIMEOUT)
+
+
+# Longest Retry-After we honor; tools are cut off after 15s, so a longer wait
+# would only turn a rate-limit error into a timeout
+MAX_RETRY_AFTER_SECONDS = 4.0
+
+_backoff = wait_exponential(multiplier=0.5, max=4)
+
+
+def _is_transient(exc: BaseException) -> bool:
+    """Connection problems, rate limiting (429) and 5xx responses are worth one retry; other 4xx are not."""
+    if isinstance(exc, httpx.HTTPStatusError):
+        status = exc.response.status_code
+        return status == 429 or status >= 500
+    return isinstance(exc, httpx.TransportError)
+
+
+def _wait(retry_state) -> float:
+    """Wait as long as a 429's Retry-After asks (capped), otherwise back off exponentially."""
+    exc = retry_state.outcome.exception()
+    if isinstance(exc, httpx.HTTPStatusError) and exc.response.status_code == 429:
+        try:
+            return min(float(exc.response.headers["Retry-After"]), MAX_RETRY_AFTER_SECONDS)
+        except (KeyError, ValueError):
+            # Missing header or an HTTP-date value: fall back to the backoff
+            pass
+    return _backoff(retry_state)
+
+
+@retry(
+    stop=stop_after_attempt(2),
+    wait=_wait,
+    retry=retry_if_exception(_is_transient),
+    reraise=True,
+)
+async def _send(method: str, path: str, **kwargs) -> httpx.Response:
+    response = await CLIENT.request(method, path, **kwargs)
+    response.raise_for_status()
+    return response
+
+
+async def on_io_loop(coro):
+    """Run ``coro`` on the shared I/O loop and await its result from the caller's loop.
+
+    Cancelling the caller (e.g. on a timeout) cancels ``coro`` too.
+    """
+    return await asyncio.wrap_future(asyncio.run_coroutine_threadsafe(coro, _IO_LOOP))
+
+
+async def request(method: str, path: str, **kwargs) -> httpx.Response:
+    """Send a request on the shared client and raise for error statuses.
+
+    A transient failure (e.g. a 429, a 502 or a dropped connection) is retried once.
+    """
+    return await on_io_loop(_send(method, path, **kwargs))
@@ -0,0 +1,42 @@
+# tools/iata.py
+"""
+Offline lookup of common city names to their main airport's IATA code.
+"""
+
+from typing import Optional
+
+# Keys are lower-case city names; values are 3-letter airport codes
+IATA = {
+    "amsterdam": "AMS",
+    "bangalore": "BLR",
+    "barcelona": "BCN",
+    "basel": "BSL",
+    "berlin": "BER",
+    "chennai": "MAA",
+    "delhi": "DEL",
+    "dubai": "DXB",
+    "frankfurt": "FRA",
+    "geneva": "GVA",
+    "london": "LHR",
+    "los angeles": "LAX",
+    "madrid": "MAD",
+    "mumbai": "BOM",
+    "munich": "MUC",
+    "new york": "JFK",
+    "paris": "CDG",
+    "rome": "FCO",
+    "singapore": "SIN",
+    "tokyo": "HND",
+    "zurich": "ZRH",
+}
+
+
+def resolve_iata(city: str) -> Optional[str]:
+    """Return the IATA code for a known city name, or None if it is not in the table."""
+    return IATA.get(city.strip().lower())
+
+
+def to_iata(code_or_city: str) -> str:
+    """Return the IATA code for a known city name; other values are upper-cased as codes."""
+    value = code_or_city.strip()
+    return resolve_iata(value) or value.upper()
@@ -1,56 +1,130 @@
 # tools/travel_tools.py
 
 from google.adk.tools import BaseTool
-from .schemas import FlightSearchResult, HotelSearchResult, ItineraryPlanResult
+from .schemas import FlightOption, FlightSearchResult, HotelOption, HotelSearchResult
+from ._http import on_io_loop, request
 from typing import List, Dict, Any, Optional
-import requests
+from datetime import date
+import asyncio
+import itertools
+import httpx
+import logging
+import orjson
 import os
-import random
+import re
+import threading
+import time
 from dotenv import load_dotenv
 
 # Load environment variables from .env file
 load_dotenv()
 
+logger = logging.getLogger("trip_planner")
+
 # --- Amadeus API Configuration ---
 # NOTE: These are loaded from environment variables (.env file)
 API_KEY = os.getenv("AMADEUS_API_KEY", "YOUR_API_KEY_HERE")
 API_SECRET = os.getenv("AMADEUS_API_SECRET", "YOUR_API_SECRET_HERE")
 
-AUTH_URL = "https://test.api.amadeus.com/v1/security/oauth2/token"
-FLIGHT_SEARCH_URL = "https://test.api.amadeus.com/v2/shopping/flight-offers"
+# Paths are relative to AMADEUS_BASE_URL in tools/_http.py
+AUTH_PATH = "/v1/security/oauth2/token"
+FLIGHT_SEARCH_PATH = "/v2/shopping/flight-offers"
 
-HOTEL_LIST_URL = "https://test.api.amadeus.com/v1/reference-data/locations/hotels/by-city"
-HOTEL_SEARCH_URL = "https://test.api.amadeus.com/v3/shopping/hotel-offers"
+HOTEL_LIST_PATH = "/v1/reference-data/locations/hotels/by-city"
+HOTEL_SEARCH_PATH = "/v3/shopping/hotel-offers"
 
-# --- Helper Function ---
-def _get_access_token() -> str:
-    """Handles the OAuth 2.0 client credentials flow to get a Bearer token."""
-    print("✈️ Amadeus Auth: Requesting new access token...")
-    
-    # The Amadeus API expects the body to be x-www-form-urlencoded
-    auth_data = {
-        "grant_type": "client_credentials",
-        "client_id": API_KEY,
-        "client_secret": API_SECRET,
-    }
+# Amadeus tokens are valid for ~30 minutes, so one token serves many calls.
+# It is refreshed a minute before it expires. The threading lock guards the
+# cache across threads (the warm-up thread and the request threads). Refreshes
+# run on the shared I/O loop under an asyncio.Lock, so concurrent searches that
+# all miss the cache share a single auth request.
+_TOKEN = {"value": None, "exp": 0.0}
+_TOKEN_LOCK = threading.Lock()
+_REFRESH_LOCK: Optional[asyncio.Lock] = None  # created on the I/O loop
+TOKEN_REFRESH_MARGIN_SECONDS = 60
+
+# Amadeus reports durations in ISO 8601 form, e.g. "PT10H30M"
+_ISO_DUR = re.compile(r"PT(?:(\d+)H)?(?:(\d+)M)?")
+
+def _fmt_duration(iso_duration: str) -> str:
+    """Formats an ISO 8601 duration as the schema's '10h 30m' style."""
+    match = _ISO_DUR.fullmatch(iso_duration)
+    if not match:
+        # Unexpected shapes (e.g. with a day component) are passed through as-is
+        return iso_duration
+    hours, minutes = match.group(1) or "0", match.group(2) or "0"
+    return f"{hours}h {minutes}m"
+
+# Flight IDs only need to be unique within the process, so a counter is enough
+_FLIGHT_ID = itertools.count(1)
+
+# --- Helper Functions ---
+def _cached_token() -> Optional[str]:
+    with _TOKEN_LOCK:
+        if _TOKEN["value"] and time.monotonic() < _TOKEN["exp"] - TOKEN_REFRESH_MARGIN_SECONDS:
+            return _TOKEN["value"]
+    return None
+
+async def _get_access_token() -> str:
+    """Returns a cached Bearer token, running the OAuth 2.0 client credentials flow when it has expired."""
+    token = _cached_token()
+    if token:
+        return token
+    return await on_io_loop(_refresh_token())
+
+async def _refresh_token() -> str:
+    """Fetches a new token; runs on the I/O loop so the lock is shared by every caller."""
+    global _REFRESH_LOCK
+    if _REFRESH_LOCK is None:
+        _REFRESH_LOCK = asyncio.Lock()
     
-    # The 'requests' library automatically sets the correct Content-Type 
-    # header ('application/x-www-form-urlencoded') when using the 'data' parameter 
-    # with a dictionary, as required by Amadeus.
-    try:
-        response = requests.post(AUTH_URL, data=auth_data)
-        response.raise_for_status() # Raise exception for bad status codes (4xx or 5xx)
-        
-        token = response.json().get("access_token")
-        if not token:
-            raise ValueError("Access token not found in authentication response.")
+    async with _REFRESH_LOCK:
+        # Another caller may have refreshed the token while we waited
+        token = _cached_token()
+        if token:
+            return token
         
-        print("✈️ Amadeus Auth: Token retrieved successfully.")
-        return token
+        # The Amadeus API expects the body to be x-www-form-urlencoded
+        auth_data = {
+            "grant_type": "client_credentials",
+            "client_id": API_KEY,
+            "client_secret": API_SECRET,
+        }
         
-    except requests.exceptions.RequestException as e:
-        print(f"❌ Amadeus Auth Error: Failed to get token. Details: {e}")
-        raise
+        # httpx automatically sets the correct Content-Type 
+        # header ('application/x-www-form-urlencoded') when using the 'data' parameter 
+        # with a dictionary, as required by Amadeus.
+        try:
+            response = await request("POST", AUTH_PATH, data=auth_data) # Raises for bad status codes (4xx or 5xx)
+            
+            auth_response = orjson.loads(response.content)
+            token = auth_response.get("access_token")
+            if not token:
+                raise ValueError("Access token not found in authentication response.")
+            
+            with _TOKEN_LOCK:
+                _TOKEN["value"] = token
+                _TOKEN["exp"] = time.monotonic() + float(auth_response.get("expires_in", 1799))
+            return token
+            
+        except httpx.HTTPError as e:
+            logger.error("❌ Amadeus Auth Error: Failed to get token. Details: %s", e)
+            raise
+
+def _forget_rejected_token(exc: Exception) -> None:
+    """Drops the cached token after a 401, so a revoked token isn't reused until it expires."""
+    if isinstance(exc, httpx.HTTPStatusError) and exc.response.status_code == 401:
+        with _TOKEN_LOCK:
+            _TOKEN["value"] = None
+            _TOKEN["exp"] = 0.0
+
+def ensure_amadeus_token() -> None:
+    """Fetches a token ahead of the first search so it is already cached when needed."""
+    try:
+        asyncio.run(_get_access_token())
+    except (httpx.HTTPError, ValueError):
+        # Already reported above; the next search simply retries the auth call
+        pass
 
     
 class FlightSearchTool(BaseTool):
@@ -60,7 +134,7 @@ class FlightSearchTool(BaseTool):
     """
     
     
-    def run(self, originLocationCode: str, destinationLocationCode: str, departureDate: str, adults: int = 1) -> FlightSearchResult:
+    async def arun(self, originLocationCode: str, destinationLocationCode: str, departureDate: str, adults: int = 1) -> FlightSearchResult:
         """
         Executes the flight offers search API call.
 
@@ -74,7 +148,7 @@ class FlightSearchTool(BaseTool):
             A structured FlightSearchResult object.
         """
         # 1. Get Access Token
-        access_token = _get_access_token()
+        access_token = await _get_access_token()
         
         # 2. Prepare API Headers and Parameters
         headers = {
@@ -89,89 +163,107 @@ class FlightSearchTool(BaseTool):
         }
 
         # 3. Make the Flight Search GET Request
-        print(f"✈️ API Executing: Searching flights from {originLocationCode} to {destinationLocationCode}...")
+        logger.info("✈️ API Executing: Searching flights from %s to %s...", originLocationCode, destinationLocationCode)
         try:
-            response = requests.get(FLIGHT_SEARCH_URL, headers=headers, params=params)
-            response.raise_for_status()
+            response = await request("GET", FLIGHT_SEARCH_PATH, headers=headers, params=params)
             
-            search_data = response.json()
+            search_data = orjson.loads(response.content)
             
             # --- 4. Process API Response to Match ADK Schema ---
             
             # This is the crucial step: map the complex Amadeus JSON response 
             # to your simple FlightSearchResult schema.
-            processed_options = []
-            
-            # We'll just take the top 3 results from the 'data' array for demonstration
-            for offer in search_data.get("data", [])[:3]:
-                # Extract the total price
-                price = float(offer["price"]["total"])
-                
-                # Get the first segment of the itinerary for departure details
-                first_segment = offer["itineraries"][0]["segments"][0]
-                departure_time = first_segment["departure"]["at"].split('T')[1][:5] # e.g., "2025-12-25T08:30:00" -> "08:30"
-                
-                # Get total duration (needs conversion from ISO 8601 duration string, 
-                # but we'll simplify it here for the skeleton)
-                duration = offer["itineraries"][0]["duration"].replace('PT', '').lower()
-                
-                processed_options.append({
-                    "flight_id": f"AMADEUS-{random.randint(100, 999)}", # Assign a unique ID
-                    "airline": first_segment["carrierCode"], # IATA airline code
-                    "price": price,
-                    "departure_time": departure_time,
-                    "duration": duration,
-                })
+            # We'll just take the top 3 results from the 'data' array for demonstration.
+            # The departure details come from the first segment of the itinerary;
+            # "2025-12-25T08:30:00"[11:16] -> "08:30". The values come straight from
+            # our own parsing, so validation is skipped.
+            processed_options = [
+                FlightOption.model_construct(
+                    flight_id=f"AMADEUS-{next(_FLIGHT_ID)}", # Assign a unique ID
+                    airline=first_segment["carrierCode"], # IATA airline code
+                    price=float(offer["price"]["total"]),
+                    departure_time=first_segment["departure"]["at"][11:16],
+                    duration=_fmt_duration(offer["itineraries"][0]["duration"]), # "PT10H30M" -> "10h 30m"
+                )
+                for offer in search_data.get("data", ())[:3]
+                for first_segment in (offer["itineraries"][0]["segments"][0],)
+            ]
 
             if not processed_options:
-                 print("⚠️ No flight offers found in the Amadeus response.")
+                 logger.warning("⚠️ No flight offers found in the Amadeus response.")
             
-            return FlightSearchResult(options=processed_options)
+            return FlightSearchResult.model_construct(options=processed_options)
             
-        except requests.exceptions.RequestException as e:
-            print(f"❌ Amadeus Search Error: Failed to search flights. Details: {e}")
+        except (httpx.HTTPError, orjson.JSONDecodeError) as e:
+            _forget_rejected_token(e)
+            logger.error("❌ Amadeus Search Error: Failed to search flights. Details: %s", e)
             # Return an empty result if the search fails gracefully
             return FlightSearchResult(options=[])
 
+    def run(self, originLocationCode: str, destinationLocationCode: str, departureDate: str, adults: int = 1) -> FlightSearchResult:
+        """Synchronous wrapper around arun() for callers without an event loop."""
+        return asyncio.run(self.arun(originLocationCode, destinationLocationCode, departureDate, adults))
+
 # --- Placeholder Tools (Unmodified, but included for completeness) ---
 
+# Up to HOTEL_ID_LIMIT hotels are priced per search. Their IDs are sent to the
+# offers endpoint in chunks, keeping each URL within Amadeus' per-call limit.
+HOTEL_ID_LIMIT = 50
+HOTEL_OFFERS_CHUNK_SIZE = 20
+HOTEL_RESULT_LIMIT = 5
+
+# The list of hotels in a city changes over hours or days, not per request, so
+# the lookup is cached per city and the cache turns over every hour. The lookup
+# is a coroutine, which functools.lru_cache cannot cache, hence the plain dict.
+HOTEL_IDS_CACHE_TTL_SECONDS = 3600
+_HOTEL_IDS_CACHE: Dict[tuple, List[str]] = {}
+
 class HotelSearchTool(BaseTool):
     """
     Tool to search for the best hotel options using a two-step Amadeus API process.
     """
     
-    def _get_hotel_ids(self, cityCode: str) -> List[str]:
+    async def _get_hotel_ids(self, cityCode: str, headers: Dict[str, str]) -> List[str]:
         """Step 1: Get a list of hotel IDs for the given city."""
-        print(f"🏨 Step 1: Searching for hotel IDs in {cityCode}...")
+        bucket = int(time.monotonic() // HOTEL_IDS_CACHE_TTL_SECONDS)
+        cached = _HOTEL_IDS_CACHE.get((bucket, cityCode))
+        if cached is not None:
+            return cached
+        
+        logger.info("🏨 Step 1: Searching for hotel IDs in %s...", cityCode)
         
-        token = _get_access_token()
-        headers = {"Authorization": f"Bearer {token}"}
         params = {"cityCode": cityCode}
         
         try:
-            response = requests.get(HOTEL_LIST_URL, headers=headers, params=params)
-            response.raise_for_status()
+            response = await request("GET", HOTEL_LIST_PATH, headers=headers, params=params)
             
-            data = response.json().get("data", [])
+            data = orjson.loads(response.content).get("data", [])
             # Extract the 'hotelId' from the list of hotel data objects
             hotel_ids = [item["hotelId"] for item in data if "hotelId" in item]
             
-            print(f"🏨 Step 1 Result: Found {len(hotel_ids)} hotel IDs.")
+            logger.info("🏨 Step 1 Result: Found %s hotel IDs.", len(hotel_ids))
             # Limit the number of IDs to search in the next step to prevent API quotas/complexity
-            return hotel_ids[:5] 
-        except requests.exceptions.RequestException as e:
-            print(f"❌ Amadeus Hotel List Error: {e}")
+            hotel_ids = hotel_ids[:HOTEL_ID_LIMIT]
+            
+            # Only real results are cached, so an empty answer is retried next time
+            if hotel_ids:
+                # Iterate over a snapshot; other Streamlit sessions may write concurrently
+                for old_key in list(_HOTEL_IDS_CACHE):
+                    if old_key[0] != bucket:
+                        _HOTEL_IDS_CACHE.pop(old_key, None)
+                _HOTEL_IDS_CACHE[(bucket, cityCode)] = hotel_ids
+            return hotel_ids
+        except (httpx.HTTPError, orjson.JSONDecodeError) as e:
+            _forget_rejected_token(e)
+            logger.error("❌ Amadeus Hotel List Error: %s", e)
             return []
 
-    def _get_hotel_offers(self, hotel_ids: List[str], check_in: str, check_out: str, adults: int) -> HotelSearchResult:
+    async def _get_hotel_offers(self, hotel_ids: List[str], check_in: str, check_out: str, adults: int, max_budget: float, nights: int, headers: Dict[str, str]) -> HotelSearchResult:
         """Step 2: Get real-time offers for the found hotel IDs."""
-        print(f"🏨 Step 2: Searching offers for {len(hotel_ids)} hotels...")
+        logger.info("🏨 Step 2: Searching offers for %s hotels...", len(hotel_ids))
         
         if not hotel_ids:
             return HotelSearchResult(options=[])
-
-        token = _get_access_token()
-        headers = {"Authorization": f"Bearer {token}"}
         
         # Amadeus requires hotel IDs as a comma-separated string
         hotel_ids_str = ",".join(hotel_ids) 
@@ -180,94 +272,82 @@ class HotelSearchTool(BaseTool):
             "hotelIds": hotel_ids_str,
             "checkInDate": check_in,
             "checkOutDate": check_out,
-            "adults": adults
+            "adults": adults,
+            # Let Amadeus drop over-budget offers instead of shipping them to us.
+            # priceRange is per night and requires an explicit currency.
+            "priceRange": f"-{int(max_budget)}",
+            "currency": "EUR",
         }
         
         try:
-            response = requests.get(HOTEL_SEARCH_URL, headers=headers, params=params)
-            response.raise_for_status()
-            search_data = response.json()
+            response = await request("GET", HOTEL_SEARCH_PATH, headers=headers, params=params)
+            search_data = orjson.loads(response.content)
             
             # --- Process API Response to Match ADK Schema ---
-            processed_options = []
-            
-            # We iterate through the offers found
-            for hotel_offer in search_data.get("data", [])[:5]:
-                # Find the cheapest offer/room in the hotel
-                cheapest_offer = hotel_offer["offers"][0] if hotel_offer.get("offers") else None
-                
-                if cheapest_offer:
-                    # The total price for the stay
-                    total_price = float(cheapest_offer["price"]["total"])
-                    # Price per night (total / number of nights) - needs date calculation logic in a real app, 
-                    # but for now, we'll simplify.
-                    price_per_night = round(total_price / 3, 2) # Mock division by 3 nights
-                    
-                    # Extract general hotel info from the 'hotel' block
-                    hotel_info = hotel_offer["hotel"]
-                    
-                    processed_options.append({
-                        "name": hotel_info.get("name", "Unknown Hotel"),
-                        "price_per_night": price_per_night,
-                        "rating": random.uniform(3.0, 5.0), # Amadeus has separate rating API, using mock here
-                        "amenities_summary": "Check for amenities in the offer details.",
-                        "distance_to_center": None,
-                    })
+            # The first offer of each hotel is its cheapest room; its price is
+            # for the whole stay. Amadeus only sometimes includes a star rating;
+            # 0.0 means unrated.
+            processed_options = [
+                HotelOption.model_construct(
+                    name=hotel_offer["hotel"].get("name", "Unknown Hotel"),
+                    price_per_night=round(float(hotel_offer["offers"][0]["price"]["total"]) / nights, 2),
+                    rating=float(hotel_offer["hotel"].get("rating") or 0.0),
+                    amenities_summary="Check for amenities in the offer details.",
+                    distance_to_center=None,
+                )
+                for hotel_offer in search_data.get("data", ())
+                if hotel_offer.get("offers")
+            ]
 
-            return HotelSearchResult(options=processed_options)
+            return HotelSearchResult.model_construct(options=processed_options)
             
-        except requests.exceptions.RequestException as e:
-            print(f"❌ Amadeus Hotel Search Error: Failed to get offers. Details: {e}")
+        except (httpx.HTTPError, orjson.JSONDecodeError) as e:
+            _forget_rejected_token(e)
+            logger.error("❌ Amadeus Hotel Search Error: Failed to get offers. Details: %s", e)
             return HotelSearchResult(options=[])
 
-    def run(self, cityCode: str, check_in: str, check_out: str, max_budget: float, adults: int = 2) -> HotelSearchResult:
+    async def arun(self, cityCode: str, check_in: str, check_out: str, max_budget: float, adults: int = 2) -> HotelSearchResult:
         """The main entry point for the Hotel Search Tool, orchestrating the two API calls."""
         
-        # 1. Get Hotel IDs
-        hotel_ids = self._get_hotel_ids(cityCode=cityCode)
+        # The dates come from the model; anything but YYYY-MM-DD means no search
+        try:
+            nights = max((date.fromisoformat(check_out) - date.fromisoformat(check_in)).days, 1)
+        except ValueError:
+            logger.warning("⚠️ Invalid hotel dates %r -> %r; expected YYYY-MM-DD.", check_in, check_out)
+            return HotelSearchResult(options=[])
         
-        # 2. Search for Offers using the IDs
-        results = self._get_hotel_offers(
-            hotel_ids=hotel_ids, 
-            check_in=check_in, 
-            check_out=check_out,
-            adults=adults
-        )
+        # Both steps share one token and, through the pooled client, one connection
+        token = await _get_access_token()
+        headers = {"Authorization": f"Bearer {token}"}
         
-        # 3. Filter results based on max_budget (optional cleanup/business logic)
-        filtered_results = [
-            option for option in results.options 
-            if option.price_per_night <= max_budget
-        ]
+        # 1. Get Hotel IDs
+        hotel_ids = await self._get_hotel_ids(cityCode=cityCode, headers=headers)
         
-        return HotelSearchResult(options=filtered_results)
-
-
-class ItineraryTool(BaseTool):
-    """
-    Tool to gather itinerary data from the internet (via Google Search)
-    and structure it into a daily plan.
-    """
-    def run(self, city: str, trip_length_days: int) -> str:
-        """
-        Signals the LLM Agent to search for itinerary ideas for the specified city and duration.
-
-        Args:
-            city: The destination city.
-            trip_length_days: The number of days for the trip.
-
-        Returns:
-            A message instructing the agent to search and structure the results.
-        """
-        print(f"🗺️ Tool Executing: Signaling Agent to search for a {trip_length_days}-day itinerary for {city} using Google Search.")
-        # This function signals that the LLM should use google_search to find itinerary information
-        # and then structure it according to the ItineraryPlanResult schema
-        return f"Search Google for a comprehensive {trip_length_days}-day itinerary for {city}, including top attractions, activities, and dining recommendations. Structure the results as a day-by-day plan."
-
-# Initialize the tool
-ITINERARY_TOOL = ItineraryTool(name="itinerary_generator", description="Generate a day-by-day itinerary plan for a trip")
+        # 2. Search for Offers using the IDs, one concurrent request per chunk
+        chunks = [hotel_ids[i:i + HOTEL_OFFERS_CHUNK_SIZE] for i in range(0, len(hotel_ids), HOTEL_OFFERS_CHUNK_SIZE)]
+        results = await asyncio.gather(*(
+            self._get_hotel_offers(
+                hotel_ids=chunk, 
+                check_in=check_in, 
+                check_out=check_out,
+                adults=adults,
+                max_budget=max_budget,
+                nights=nights,
+                headers=headers
+            )
+            for chunk in chunks
+        ))
+        
+        # 3. Merge the chunks and keep the cheapest options
+        options = sorted(
+            (option for result in results for option in result.options),
+            key=lambda option: option.price_per_night,
+        )
+        return HotelSearchResult.model_construct(options=options[:HOTEL_RESULT_LIMIT])
 
-# ... (Rest of the file) ...
+    def run(self, cityCode: str, check_in: str, check_out: str, max_budget: float, adults: int = 2) -> HotelSearchResult:
+        """Synchronous wrapper around arun() for callers without an event loop."""
+        return asyncio.run(self.arun(cityCode, check_in, check_out, max_budget, adults))
 
 # Initialize the tools for use in the agent definitions
 FLIGHT_TOOL = FlightSearchTool(name="flight_search", description="Search for flight options")